@@ -25,17 +25,20 @@ class Flow(BaseFlow):
     def run_single_flow(self):
         self.graph.clear_leafs()
         self.fill_started_nodes_deque()
+        graph = self.graph
+        all_nodes = graph.all_nodes
+        get_node = graph.get_node
+        current_flow_num = self.current_flow_num
         while len(self._nodes_flow_deque) > 0:
             node_id, node_id_from = self._nodes_flow_deque.popleft()
-            if node_id not in self.graph.all_nodes:
+            node = all_nodes.get(node_id)
+            if node is None:
                 continue
 
-            node = self.graph.get_node(node_id)
-            output_nodes_ids = node.forward_flow(self.graph, self.current_flow_num, node_id_from)
+            output_nodes_ids = node.forward_flow(graph, current_flow_num, node_id_from)
             if isinstance(output_nodes_ids, list):
                 output_nodes_ids = [node_id for node_id in output_nodes_ids
-                                    if self.graph.get_node(node_id).check_inactive_count(self.graph,
-                                                                                         self.current_flow_num)]
+                                    if get_node(node_id).check_inactive_count(graph, current_flow_num)]
             if output_nodes_ids == -1:
                 continue
             elif len(output_nodes_ids) > 0:
@@ -44,6 +47,7 @@ class Flow(BaseFlow):
             else:
                 self.process_leaf(node_id)
         self.graph.connect_leafs()
+        self.graph.flush_draw()
         self.current_flow_num += 1
 
     def run_flow(self) -> None:
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Sequence
 
 import gin
 
@@ -27,7 +27,7 @@ class GrowingGraph(Graph):
         return new_node.id
 
     def grow_receptors(self):
-        receptors_leafs = set(leaf_id for leaf_id in self._leafs if leaf_id in self.input_nodes_ids)
+        receptors_leafs = set(leaf_id for leaf_id in self._leafs if leaf_id in self.input_nodes_ids_set)
         self._leafs = self._leafs - receptors_leafs
         new_rec_leafs_ids = set(self.add_leaf_node([receptor_id]) for receptor_id in receptors_leafs)
         for rec_leaf_id in new_rec_leafs_ids:
@@ -41,17 +41,19 @@ class GrowingGraph(Graph):
     def connect_leafs(self):
         self.grow_receptors()
 
-        active_leafs = set(leaf_id for leaf_id in self._leafs if self.get_node(leaf_id).is_active())
+        get_node = self.get_node
+        active_leafs = set(leaf_id for leaf_id in self._leafs if get_node(leaf_id)._is_active)
         if len(active_leafs) > 1:
             leaf_node_id = self.add_leaf_node(list(active_leafs), make_active=True)
             self._leafs = {leaf_node_id}
 
     def get_output_class(self):
-        active_leafs = set(leaf_id for leaf_id in self._leafs if self.get_node(leaf_id).is_active())
+        get_node = self.get_node
+        active_leafs = set(leaf_id for leaf_id in self._leafs if get_node(leaf_id)._is_active)
 
         leaf_group_ids = set()
         for leaf_id in active_leafs:
-            leaf = self.get_node(leaf_id)
+            leaf = get_node(leaf_id)
             leaf_group_ids.add(leaf.group_id)
 
         return str(sorted(leaf_group_ids))
@@ -65,7 +67,7 @@ class GrowingGraph(Graph):
         self.add_edges(node_id=node_copy.id, nodes_ids=node._output_nodes_ids, as_input=False)
         return node_copy
 
-    def add_node_with_edges(self, node: Node, input_nodes_ids: List[int], output_nodes_ids: List[int]):
+    def add_node_with_edges(self, node: Node, input_nodes_ids: Sequence[int], output_nodes_ids: Sequence[int]):
         self.add_node(node, is_input=False)
         self.add_edges(node_id=node.id, nodes_ids=input_nodes_ids, as_input=True)
         self.add_edges(node_id=node.id, nodes_ids=output_nodes_ids, as_input=False)
@@ -1,6 +1,5 @@
-from collections import defaultdict
-from copy import copy
-from typing import List, Optional, Union
+from array import array
+from typing import Dict, List, Optional, Union
 
 import gin
 
@@ -10,24 +9,42 @@ import logging
 logger = logging.getLogger()
 
 
+class ActivationMixin:
+    """Keeps the activation state cached alongside the node value"""
+    _activation_limit: float
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, new_value):
+        self._value = new_value
+        self._is_active = new_value >= self._activation_limit
+
+    def is_active(self) -> bool:
+        return self._is_active
+
+
 @gin.configurable
-class GrowingNode(Node):
+class GrowingNode(ActivationMixin, Node):
     group_id = 0
 
     def __init__(self, activation_limit: float = 0.5, default_value=0, active_count: int = 5,
                  inactive_count: int = 5, max_duplicates: int = 3, group_id: Optional[int] = None, *args, **kwargs):
+        self._activation_limit = activation_limit
         super().__init__(default_value, *args, **kwargs)
 
         self.group_id = GrowingNode.update_group_id() if group_id is None else group_id
 
-        self._activation_limit = activation_limit
         self._active_count = active_count
         self._default_active_count = active_count
         self._inactive_count = inactive_count
         self._default_inactive_count = inactive_count
         self._make_duplicate_flow_id = None
         self._duplicate_left = max_duplicates
-        self._input_nodes_values = defaultdict(int)
+        self._input_nodes_index: Dict[int, int] = {}
+        self._input_nodes_values = array('d')
         self._value_sum = 0
 
     @classmethod
@@ -35,30 +52,31 @@ class GrowingNode(Node):
         cls.group_id += 1
         return cls.group_id
 
-    def is_active(self) -> bool:
-        return self.is_active_value(self.value, self._activation_limit)
-
-    @staticmethod
-    def is_active_value(value: float, activation_limit: float):
-        return value >= activation_limit
-
     def calc_value(self, node: Union['GrowingNodeReceptor', 'GrowingNode'], node_id_from: int) -> float:
-        stored_node_value = self._input_nodes_values[node_id_from]
+        input_values = self._input_nodes_values
+        value_pos = self._input_nodes_index.get(node_id_from)
+        if value_pos is None:
+            value_pos = len(input_values)
+            self._input_nodes_index[node_id_from] = value_pos
+            input_values.append(0.0)
+
         node_value = node.value
-        self._value_sum -= stored_node_value
+        self._value_sum -= input_values[value_pos]
         self._value_sum += node_value
-        self._input_nodes_values[node_id_from] = node_value
-        return self._value_sum / len(self._input_nodes_values)
+        input_values[value_pos] = node_value
+        return self._value_sum / len(input_values)
 
     def _process_active_value(self, graph):
         if self._active_count <= 0:
             node_copy = GrowingNode(default_value=0, default_flow_id=self.flow_calc_id, group_id=self.group_id)
             node_copy.value = self.value
+            get_node = graph.get_node
+            input_nodes_ids = graph.input_nodes_ids_set
             graph.add_node_with_edges(
                 node_copy,
-                input_nodes_ids=[node_id for node_id in self._input_nodes_ids if node_id in graph.input_nodes_ids
-                                 or graph.get_node(node_id).is_active()],
-                output_nodes_ids=copy(self._output_nodes_ids)
+                input_nodes_ids=[node_id for node_id in self._input_nodes_ids if node_id in input_nodes_ids
+                                 or get_node(node_id)._is_active],
+                output_nodes_ids=tuple(self._output_nodes_ids)
             )
             self._active_count = self._default_active_count
             self._duplicate_left -= 1
@@ -81,11 +99,12 @@ class GrowingNode(Node):
         return is_alive
 
     def _process_inputs(self, graph: 'GrowingGraph', node_id_from: int) -> Union[int, List[int], None]:
-        prev_state = self.is_active()
+        prev_state = self._is_active
         prev_value = self.value
         self.value = self.calc_value(graph.get_node(node_id_from), node_id_from)
-        output_nodes_ids = self._output_nodes_ids if self.is_active() and prev_value != self.value else -1
-        if prev_state != self.is_active() and self.is_active():
+        active = self._is_active
+        output_nodes_ids = self._output_nodes_ids if active and prev_value != self.value else -1
+        if active and not prev_state:
             self._process_active_value(graph)
 
         if self._duplicate_left == 0:
@@ -98,7 +117,8 @@ class GrowingNode(Node):
         if self.flow_calc_id != current_flow_id:
             self.value = 0
             self._value_sum = 0
-            self._input_nodes_values = defaultdict(int)
+            self._input_nodes_index.clear()
+            del self._input_nodes_values[:]
             self.flow_calc_id = current_flow_id
         return self._process_inputs(graph, node_id_from)
 
@@ -107,19 +127,16 @@ class GrowingNode(Node):
 
 
 @gin.configurable()
-class GrowingNodeReceptor(Receptor):
+class GrowingNodeReceptor(ActivationMixin, Receptor):
     def __init__(self, activation_limit: float, *args, **kwargs):
-        super().__init__(*args, **kwargs)
         self._activation_limit = activation_limit
-
-    def is_active(self):
-        return self.value >= self._activation_limit
+        super().__init__(*args, **kwargs)
 
     def forward_flow(self, graph: 'Graph', current_flow_id: int, prev_node: int) -> Optional[List[int]]:
         self.flow_calc_id = current_flow_id
         try:
             self.value = self.calc_value()
-            return self._output_nodes_ids if self.is_active() else -1
+            return self._output_nodes_ids if self._is_active else -1
 
         except StopIteration:
             logger.info(f"Found stop iterator on receptor with {self.id=}")
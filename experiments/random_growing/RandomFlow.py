@@ -10,7 +10,7 @@ class RandomFlow(BaseFlow):
         self.fill_started_nodes_deque()
         ignore_nodes = set()
         while len(self._nodes_flow_deque) > 0:
-            node_id = self._nodes_flow_deque.popleft()
+            node_id = self.pop_from_nodes_deque()
             if node_id in ignore_nodes:
                 continue
             node = self.graph.get_node(node_id)
@@ -19,6 +19,7 @@ class RandomFlow(BaseFlow):
                 self.append_to_nodes_deque(output_nodes_ids)
             else:
                 ignore_nodes.add(self.process_leaf(node_id))
+        self.graph.flush_draw()
 
     def process_leaf(self, node_id: int):
         """Process node without output"""
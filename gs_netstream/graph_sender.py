@@ -30,7 +30,13 @@ class NetStreamProxyGraph:
     def run_sender_method(self, sender_method, *args, **kwargs):
         sender_method(self.source_id, self.time_id, *args, **kwargs)
         self.time_id += 1
-        sleep(self.sleep_time)
+        if self.sleep_time > 0:
+            self.flush()
+            sleep(self.sleep_time)
+
+    def flush(self):
+        """Send all buffered events to the viewer."""
+        self.sender.flush()
 
     def add_node(self, node: str):
         """Add a node to the graph."""
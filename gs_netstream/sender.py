@@ -14,43 +14,112 @@ Hugo Hromic <hugo.hromic@insight-centre.org>
 
 import socket
 import struct
-from typing import List, Any, Optional
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
 
 from .constants import *
 import logging
 from .common import AttributeSink, ElementSink
-from .sender_utils import get_msg, get_type, encode_value
+from .sender_utils import get_type, encode_value
 logger = logging.getLogger()
 
+# fixed 4-bytes size which starts every packet
+_SIZE_STRUCT = struct.Struct("!i")
+
+# event argument which is sent as its detected data type followed by the value
+_TYPED_VALUE = None
+
+
+class _EventSpec(NamedTuple):
+    prefix: bytes
+    args_types: Tuple[Optional[int], ...]
+    log_format: str
+
+
+def _event_spec(event: int, description: str, args_types: Tuple[Optional[int], ...],
+                args_names: Tuple[str, ...]) -> _EventSpec:
+    """Describe the event sent as the event byte, source id, time id and the event arguments."""
+    log_format = " ".join([f"{description}: source_id=%s time_id=%s"] + [f"{name}=%s" for name in args_names])
+    return _EventSpec(bytes(encode_value(event, TYPE_BYTE)), args_types, log_format)
+
+
+# node or edge id followed by the attribute name
+_ELEMENT_ATTR_KEY_TYPES = (TYPE_STRING, TYPE_STRING)
+# event, its description, arguments types and arguments names
+_EVENTS_DESCRIPTIONS = (
+    (EVENT_ADD_NODE, "node added", (TYPE_STRING,), ("node_id",)),
+    (EVENT_DEL_NODE, "node removed", (TYPE_STRING,), ("node_id",)),
+    (EVENT_ADD_EDGE, "edge added", (TYPE_STRING, TYPE_STRING, TYPE_STRING, TYPE_BOOLEAN),
+     ("edge_id", "from_node", "to_node", "directed")),
+    (EVENT_DEL_EDGE, "edge removed", (TYPE_STRING,), ("edge_id",)),
+    (EVENT_STEP, "step begun", (TYPE_DOUBLE,), ("timestamp",)),
+    (EVENT_CLEARED, "graph cleared", (), ()),
+    (EVENT_ADD_GRAPH_ATTR, "graph attribute added", (TYPE_STRING, _TYPED_VALUE), ("attribute", "value")),
+    (EVENT_CHG_GRAPH_ATTR, "graph attribute changed", (TYPE_STRING, _TYPED_VALUE, _TYPED_VALUE),
+     ("attribute", "old_value", "new_value")),
+    (EVENT_DEL_GRAPH_ATTR, "graph attribute removed", (TYPE_STRING,), ("attribute",)),
+    (EVENT_ADD_NODE_ATTR, "node attribute added", _ELEMENT_ATTR_KEY_TYPES + (_TYPED_VALUE,),
+     ("node_id", "attribute", "value")),
+    (EVENT_CHG_NODE_ATTR, "node attribute changed", _ELEMENT_ATTR_KEY_TYPES + (_TYPED_VALUE, _TYPED_VALUE),
+     ("node_id", "attribute", "old_value", "new_value")),
+    (EVENT_DEL_NODE_ATTR, "node attribute removed", _ELEMENT_ATTR_KEY_TYPES, ("node_id", "attribute")),
+    (EVENT_ADD_EDGE_ATTR, "edge attribute added", _ELEMENT_ATTR_KEY_TYPES + (_TYPED_VALUE,),
+     ("edge_id", "attribute", "value")),
+    (EVENT_CHG_EDGE_ATTR, "edge attribute changed", _ELEMENT_ATTR_KEY_TYPES + (_TYPED_VALUE, _TYPED_VALUE),
+     ("edge_id", "attribute", "old_value", "new_value")),
+    (EVENT_DEL_EDGE_ATTR, "edge attribute removed", _ELEMENT_ATTR_KEY_TYPES, ("edge_id", "attribute")),
+)
+EVENTS_SPECS: Dict[int, _EventSpec] = {
+    event: _event_spec(event, description, args_types, args_names)
+    for event, description, args_types, args_names in _EVENTS_DESCRIPTIONS
+}
+
 
 class DefaultNetStreamTransport:
     """Default transport class using TCP/IP networking."""
 
-    def __init__(self, host, port: int):
-        """Initialize using host and port."""
+    def __init__(self, host, port: int, send_threshold: int = 64 * 1024):
+        """Initialize using host, port and the size of buffered data which triggers sending."""
         self.host = host
         self.port = port
         self.socket = None
+        self._buff = bytearray()
+        self._send_threshold = send_threshold
 
     def connect(self):
         """Connect to remote server if necessary."""
         if self.socket is None:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             logger.info(f"Connecting to remote server - host = {self.host}, port = {self.port}")
             self.socket.connect((self.host, self.port))
 
     def send(self, data):
-        """Send data to remote server."""
+        """Buffer data and send it to remote server once the buffer is big enough.
+
+        Notes:
+            data may be a view into the NetStreamSender send buffer which is overwritten by the next event,
+            so every transport has to copy it before returning
+        """
+        self._buff.extend(data)
+        if len(self._buff) >= self._send_threshold:
+            self.flush()
+
+    def flush(self):
+        """Send all buffered data to remote server."""
+        if not self._buff:
+            return
         if not self.socket:
             self.connect()
         try:
-            self.socket.sendall(data)
+            self.socket.sendall(self._buff)
         except socket.error as err:
             self.socket = None
             logger.error(err)
+        self._buff = bytearray()
 
     def close(self):
-        """Close the connection."""
+        """Flush buffered data and close the connection."""
+        self.flush()
         if self.socket:
             self.socket.close()
             self.socket = None
@@ -66,10 +135,13 @@ class NetStreamSender(AttributeSink, ElementSink):
         self.port: int = port
         self.stream: Optional[str] = None
         self.stream_buff: Optional[bytearray] = None
+        self._stream_len: int = 0
+        self._send_buff = bytearray(4096)
         self.set_stream(stream)
         self.source_id: Optional[str] = None
         self.source_id_buff: Optional[bytearray] = None
         self.set_source_id("")
+        # any object with send, flush and close methods, see DefaultNetStreamTransport.send for the data contract
         self.transport: Optional[DefaultNetStreamTransport] = None
         self.connect()
 
@@ -80,6 +152,13 @@ class NetStreamSender(AttributeSink, ElementSink):
         """Set and cache a stream ID."""
         self.stream = stream
         self.stream_buff = encode_value(stream, TYPE_STRING)
+        self._stream_len = len(self.stream_buff)
+        self._reset_send_buff(len(self._send_buff))
+
+    def _reset_send_buff(self, size: int):
+        """Allocate the reusable send buffer which always starts with room for the size and the cached stream ID."""
+        self._send_buff = bytearray(max(size, 4 + self._stream_len))
+        self._send_buff[4:4 + self._stream_len] = self.stream_buff
 
     def set_source_id(self, source_id: str):
         """Set and cache a source ID."""
@@ -90,26 +169,76 @@ class NetStreamSender(AttributeSink, ElementSink):
         """Connect to the underlying transport."""
         self.transport = DefaultNetStreamTransport(self.host, self.port)
 
+    def _frame(self, event) -> memoryview:
+        """Frame an encoded event as the packet size, the cached stream ID and the event in the reusable send buffer.
+
+        Notes:
+            the returned view is valid only until the next framed event
+        """
+        stream_end = 4 + self._stream_len
+        packet_len = self._stream_len + len(event)
+        buff_len = 4 + packet_len
+        if len(self._send_buff) < buff_len:
+            self._reset_send_buff(2 * buff_len)
+
+        buff = self._send_buff
+        _SIZE_STRUCT.pack_into(buff, 0, packet_len)
+        buff[stream_end:buff_len] = event
+        return memoryview(buff)[:buff_len]
+
     def send(self, event):
         """Send a graph event to the remote server."""
-        packet = bytearray()
-        packet.extend(self.stream_buff)
-        packet.extend(event)
-        buff = bytearray()
-        buff.extend(struct.pack("!i", len(packet)))  # fixed 4-bytes size!
-        buff.extend(packet)
-        self.transport.send(buff)
+        self.transport.send(self._frame(event))
+
+    def flush(self):
+        """Send all events buffered by the underlying transport."""
+        if self.transport is not None:
+            self.transport.flush()
 
     def close(self):
         """Close the underlying transport."""
         if self.transport is not None:
             self.transport.close()
 
-    def send_msg(self, source_id: str, values: List[Any], value_types: List[int]):
+    def encode_event(self, event: int, source_id: str, time_id: int, args: Sequence[Any]) -> bytearray:
+        """Encode a graph event described in EVENTS_SPECS."""
         if source_id != self.source_id:
             self.set_source_id(source_id)
-        buff = get_msg(values, value_types)
-        self.send(buff)
+        event_spec = EVENTS_SPECS[event]
+        if len(args) != len(event_spec.args_types):
+            raise TypeError(f"event {event} takes {len(event_spec.args_types)} arguments but {len(args)} were given")
+        buff = bytearray(event_spec.prefix)
+        buff.extend(self.source_id_buff)
+        buff.extend(encode_value(time_id, TYPE_INT))
+        for value, value_type in zip(args, event_spec.args_types):
+            if value_type is _TYPED_VALUE:
+                value_type = get_type(value)
+                buff.extend(encode_value(value_type, TYPE_BYTE))
+            buff.extend(encode_value(value, value_type))
+        return buff
+
+    def emit(self, event: int, source_id: str, time_id: int, args: Sequence[Any]):
+        """Send a graph event described in EVENTS_SPECS."""
+        self.send(self.encode_event(event, source_id, time_id, args))
+        logger.debug(EVENTS_SPECS[event].log_format, source_id, time_id, *args)
+
+    def send_many(self, events: Iterable[Tuple[Any, ...]]):
+        """Send several graph events at once.
+
+        Notes:
+            every event is a tuple of the event constant, source id, time id and the arguments of the sink method,
+            the events are flushed after every step like in step_begun
+        """
+        buff = bytearray()
+        for event, source_id, time_id, *args in events:
+            buff.extend(self._frame(self.encode_event(event, source_id, time_id, args)))
+            logger.debug(EVENTS_SPECS[event].log_format, source_id, time_id, *args)
+            if event == EVENT_STEP:
+                self.transport.send(buff)
+                self.flush()
+                buff = bytearray()
+        if buff:
+            self.transport.send(buff)
 
     ###########################
     # ElementSink methods
@@ -117,72 +246,28 @@ class NetStreamSender(AttributeSink, ElementSink):
 
     def node_added(self, source_id: str, time_id: int, node_id: str):
         """A node was added."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_ADD_NODE, source_id, time_id, node_id],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING])
-        logger.debug("node added: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "node_id": node_id
-        })
+        self.emit(EVENT_ADD_NODE, source_id, time_id, (node_id,))
 
     def node_removed(self, source_id: str, time_id: int, node_id: str):
         """A node was removed."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_DEL_NODE, source_id, time_id, node_id],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING])
-        logger.debug("node removed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "node_id": node_id
-        })
+        self.emit(EVENT_DEL_NODE, source_id, time_id, (node_id,))
 
     def edge_added(self, source_id: str, time_id: int, edge_id: str, from_node: str, to_node: str, directed: bool):
         """An edge was added."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_ADD_EDGE, source_id, time_id, edge_id, from_node, to_node, directed],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING, TYPE_STRING,
-                                   TYPE_BOOLEAN])
-        logger.debug("edge added: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "edge_id": edge_id,
-            "from_node": from_node,
-            "to_node": to_node,
-            "directed": directed
-        })
+        self.emit(EVENT_ADD_EDGE, source_id, time_id, (edge_id, from_node, to_node, directed))
 
     def edge_removed(self, source_id: str, time_id: int, edge_id: str):
         """An edge was removed."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_DEL_EDGE, source_id, time_id, edge_id],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING])
-        logger.debug("edge removed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "node_id": edge_id
-        })
+        self.emit(EVENT_DEL_EDGE, source_id, time_id, (edge_id,))
 
     def step_begun(self, source_id: str, time_id: int, timestamp: int):
         """A new step begun."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_STEP, source_id, time_id, timestamp],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_DOUBLE])
-        logger.debug("step begun: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "timestamp": timestamp
-        })
+        self.emit(EVENT_STEP, source_id, time_id, (timestamp,))
+        self.flush()
 
     def graph_cleared(self, source_id: str, time_id: int):
         """The graph was cleared."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_CLEARED, source_id, time_id],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT])
-        logger.debug("graph cleared: %s", {
-            "source_id": source_id,
-            "time_id": time_id
-        })
+        self.emit(EVENT_CLEARED, source_id, time_id, ())
 
     ###########################
     # AttributeSink methods
@@ -190,134 +275,36 @@ class NetStreamSender(AttributeSink, ElementSink):
 
     def graph_attribute_added(self, source_id: str, time_id: int, attribute: str, value):
         """A graph attribute was added."""
-        dtype = get_type(value)
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_ADD_GRAPH_ATTR, source_id, time_id, attribute, dtype, value],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_BYTE, dtype])
-        logger.debug("graph attribute added: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "attribute": attribute,
-            "value": value
-        })
+        self.emit(EVENT_ADD_GRAPH_ATTR, source_id, time_id, (attribute, value))
 
     def graph_attribute_changed(self, source_id: str, time_id: int, attribute: str, old_value, new_value):
         """A graph attribute was changed."""
-        old_value_dtype = get_type(old_value)
-        new_value_dtype = get_type(new_value)
-
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_CHG_GRAPH_ATTR, source_id, time_id, attribute, old_value_dtype, old_value,
-                              new_value_dtype, new_value],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_BYTE, old_value_dtype,
-                                   TYPE_BYTE, new_value_dtype])
-        logger.debug("graph attribute changed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "attribute": attribute,
-            "old_value": old_value,
-            "new_value": new_value
-        })
+        self.emit(EVENT_CHG_GRAPH_ATTR, source_id, time_id, (attribute, old_value, new_value))
 
     def graph_attribute_removed(self, source_id: str, time_id: int, attribute: str):
         """A graph attribute was removed."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_DEL_GRAPH_ATTR, source_id, time_id, attribute],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING])
-        logger.debug("graph attribute removed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "attribute": attribute
-        })
+        self.emit(EVENT_DEL_GRAPH_ATTR, source_id, time_id, (attribute,))
 
     def node_attribute_added(self, source_id: str, time_id: int, node_id: str, attribute: str, value):
         """A node attribute was added."""
-        dtype = get_type(value)
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_ADD_NODE_ATTR, source_id, time_id, node_id, attribute, dtype, value],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING, TYPE_BYTE, dtype])
-        logger.debug("node attribute added: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "node_id": node_id,
-            "attribute": attribute,
-            "value": value
-        })
+        self.emit(EVENT_ADD_NODE_ATTR, source_id, time_id, (node_id, attribute, value))
 
     def node_attribute_changed(self, source_id: str, time_id: int, node_id: str, attribute: str, old_value, new_value):
         """A node attribute was changed."""
-        old_value_dtype = get_type(old_value)
-        new_value_dtype = get_type(new_value)
-
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_CHG_NODE_ATTR, source_id, time_id, node_id, attribute, old_value_dtype, old_value,
-                              new_value_dtype, new_value],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING, TYPE_BYTE,
-                                   old_value_dtype, TYPE_BYTE, new_value_dtype])
-        logger.debug("node attribute changed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "node_id": node_id,
-            "attribute": attribute,
-            "old_value": old_value,
-            "new_value": new_value
-        })
+        self.emit(EVENT_CHG_NODE_ATTR, source_id, time_id, (node_id, attribute, old_value, new_value))
 
     def node_attribute_removed(self, source_id: str, time_id: int, node_id: str, attribute: str):
         """A node attribute was removed."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_DEL_NODE_ATTR, source_id, time_id, node_id, attribute],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING])
-        logger.debug("node attribute removed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "node_id": node_id,
-            "attribute": attribute
-        })
+        self.emit(EVENT_DEL_NODE_ATTR, source_id, time_id, (node_id, attribute))
 
     def edge_attribute_added(self, source_id: str, time_id: int, edge_id: str, attribute: str, value):
         """An edge attribute was added."""
-        dtype = get_type(value)
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_ADD_EDGE_ATTR, source_id, time_id, edge_id, attribute, dtype, value],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING, TYPE_BYTE, dtype])
-        logger.debug("edge attribute added: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "edge_id": edge_id,
-            "attribute": attribute,
-            "value": value
-        })
+        self.emit(EVENT_ADD_EDGE_ATTR, source_id, time_id, (edge_id, attribute, value))
 
     def edge_attribute_changed(self, source_id: str, time_id: int, edge_id: str, attribute: str, old_value, new_value):
         """An edge attribute was changed."""
-        old_value_dtype = get_type(old_value)
-        new_value_dtype = get_type(new_value)
-
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_CHG_EDGE_ATTR, source_id, time_id, edge_id, attribute, old_value_dtype, old_value,
-                              new_value_dtype, new_value],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING, TYPE_BYTE,
-                                   old_value_dtype, TYPE_BYTE, new_value_dtype])
-
-        logger.debug("edge attribute changed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "edge_id": edge_id,
-            "attribute": attribute,
-            "old_value": old_value,
-            "new_value": new_value
-        })
+        self.emit(EVENT_CHG_EDGE_ATTR, source_id, time_id, (edge_id, attribute, old_value, new_value))
 
     def edge_attribute_removed(self, source_id: str, time_id: int, edge_id: str, attribute: str):
         """An edge attribute was removed."""
-        self.send_msg(source_id=source_id,
-                      values=[EVENT_DEL_EDGE_ATTR, source_id, time_id, edge_id, attribute],
-                      value_types=[TYPE_BYTE, TYPE_STRING, TYPE_INT, TYPE_STRING, TYPE_STRING])
-
-        logger.debug("edge attribute removed: %s", {
-            "source_id": source_id,
-            "time_id": time_id,
-            "edge_id": edge_id,
-            "attribute": attribute
-        })
+        self.emit(EVENT_DEL_EDGE_ATTR, source_id, time_id, (edge_id, attribute))
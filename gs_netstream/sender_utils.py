@@ -1,24 +1,23 @@
 """Sender encoding utils"""
 import struct
-from itertools import chain
+from functools import lru_cache
 from typing import List, Callable, Any, Optional
 
 from .constants import *
-import numpy as np
 
 
-ENCODING_SIZES = np.array([1 << 7, 1 << 14, 1 << 21, 1 << 28, 1 << 35, 1 << 42, 1 << 49, 1 << 56])
+DOUBLE_STRUCT = struct.Struct("!d")
+# longest varint the sender encodes
+MAX_ENCODING_SIZE = 9
 
 
 def encoding_size(value: int) -> int:
     """Computes the encoding size of a value."""
-    dist = (ENCODING_SIZES - value) <= 0
-    return 9 if not np.all(dist) else np.argmin(dist) + 1
+    return min(max(1, (value.bit_length() + 6) // 7), MAX_ENCODING_SIZE)
 
 
-def encode_unsigned(value: int) -> bytearray:
-    """Encodes a Python integer into its varint representation."""
-    assert isinstance(value, int) and value >= 0, f"Value argument is not an integer or is negative = {value}"
+@lru_cache(maxsize=4096)
+def _encode_unsigned_bytes(value: int) -> bytes:
     size = encoding_size(value)
     buff = bytearray(size)
     for i in range(size):
@@ -26,7 +25,13 @@ def encode_unsigned(value: int) -> bytearray:
         if i == size - 1:
             head = 0
         buff[i] = (((value >> (7 * i)) & 127) ^ head) & 255
-    return buff
+    return bytes(buff)
+
+
+def encode_unsigned(value: int) -> bytearray:
+    """Encodes a Python integer into its varint representation."""
+    assert isinstance(value, int) and value >= 0, f"Value argument is not an integer or is negative = {value}"
+    return bytearray(_encode_unsigned_bytes(value))
 
 
 TYPES_CONVERTER = {
@@ -37,11 +42,10 @@ TYPES_CONVERTER = {
 }
 
 
-def get_type(value: Any) -> int:
-    """Get the data type for a given value."""
-    is_array = isinstance(value, list)
-    value_type_str = type(value[0] if is_array else value).__name__
-    netstream_type = TYPES_CONVERTER.get(value_type_str, None)
+@lru_cache(maxsize=64)
+def _get_type_by_pytype(value_pytype: type, is_array: bool) -> int:
+    """Get the data type for a given python type of the value (or of the array elements)."""
+    netstream_type = TYPES_CONVERTER.get(value_pytype.__name__, None)
     if netstream_type is None:
         raise NotImplementedError("dicts are not supported")
 
@@ -49,10 +53,20 @@ def get_type(value: Any) -> int:
     return netstream_type[type_pos]
 
 
+def get_type(value: Any) -> int:
+    """Get the data type for a given value."""
+    if isinstance(value, list):
+        return _get_type_by_pytype(type(value[0]), True)
+    return _get_type_by_pytype(type(value), False)
+
+
 def encode_array(values_array: List, single_value_type, encoding_method: Callable) -> bytearray:
-    assert isinstance(values_array, list) and all([isinstance(v, single_value_type) for v in values_array]), \
+    assert isinstance(values_array, list) and all(isinstance(v, single_value_type) for v in values_array), \
         f"Values_array should be an array with values of type {single_value_type}, but values array = {values_array}"
-    return bytearray(chain(encode_unsigned(len(values_array)), *[encoding_method(elem) for elem in values_array]))
+    buff = encode_unsigned(len(values_array))
+    for elem in values_array:
+        buff.extend(encoding_method(elem))
+    return buff
 
 
 def encode_boolean(value: bool) -> bytearray:
@@ -72,7 +86,7 @@ def encode_int_array(value: List[int]) -> bytearray:
 
 def encode_double(value: int) -> bytearray:
     """Encode a double type."""
-    return bytearray(struct.pack("!d", value))
+    return bytearray(DOUBLE_STRUCT.pack(value))
 
 
 def encode_double_array(value: List[int]) -> bytearray:
@@ -80,10 +94,15 @@ def encode_double_array(value: List[int]) -> bytearray:
     return encode_array(value, float, encode_double)
 
 
+@lru_cache(maxsize=1024)
+def _encode_string_bytes(string: str) -> bytes:
+    data = string.encode("UTF-8")
+    return _encode_unsigned_bytes(len(data)) + data
+
+
 def encode_string(string: str) -> bytearray:
     """Encode a string type."""
-    data = bytearray(string, "UTF-8")
-    return bytearray(chain(encode_unsigned(len(data)), data))
+    return bytearray(_encode_string_bytes(string))
 
 
 def encode_byte(value) -> bytearray:
@@ -107,7 +126,3 @@ def encode_value(value: Any, dtype: int) -> Optional[bytearray]:
     """Encode a value according to a given data type."""
     encoder = TYPE_TO_ENCODER.get(dtype, None)
     return encoder(value) if encoder is not None else None
-
-
-def get_msg(values: List[Any], types: List[int]) -> bytearray:
-    return bytearray(chain(*[encode_value(value, value_type) for value, value_type in zip(values, types)]))
@@ -1,10 +1,11 @@
 """Implementation of the basic Flow which can fill the Graph and run the Flow"""
 from collections import deque
-from typing import List
+from typing import List, Set
 
 import gin
 
 from model_classes.Graph import Graph
+from model_classes.Node import Node
 
 
 @gin.configurable
@@ -12,29 +13,55 @@ class BaseFlow:
     def __init__(self, graph: Graph):
         self.graph = graph
         self._nodes_flow_deque = deque()
+        self._in_queue: Set[int] = set()
         self.current_flow_num = 0
 
     def fill_started_nodes_deque(self):
+        self._nodes_flow_deque.clear()
+        self._in_queue.clear()
         self.append_to_nodes_deque(self.graph.input_nodes_ids)
 
     def append_to_nodes_deque(self, nodes_ids: List[int]):
+        """Add nodes to the flow skipping the ones which are already waiting in it"""
         for node_id in nodes_ids:
-            if len(self._nodes_flow_deque) == 0 or node_id != self._nodes_flow_deque[-1]:
+            if node_id not in self._in_queue:
+                self._in_queue.add(node_id)
                 self._nodes_flow_deque.append(node_id)
 
+    def pop_from_nodes_deque(self) -> int:
+        node_id = self._nodes_flow_deque.popleft()
+        self._in_queue.discard(node_id)
+        return node_id
+
+    def _process_node(self, node: Node):
+        """Calculate the node and queue its output nodes which are not calculated yet in the current flow"""
+        current_flow_num = self.current_flow_num
+        output_nodes_ids = node.forward_flow(self.graph, current_flow_num)
+        if len(output_nodes_ids) > 0:
+            get_node = self.graph.get_node
+            self.append_to_nodes_deque([node_id for node_id in output_nodes_ids
+                                        if get_node(node_id).flow_calc_id != current_flow_num])
+        else:
+            self.process_leaf(node.id)
+
+    def _push_step(self):
+        """Process all queued nodes at once, their output nodes are queued for the next step"""
+        nodes_ids = self._nodes_flow_deque
+        self._nodes_flow_deque = deque()
+        self._in_queue.clear()
+        get_node = self.graph.get_node
+        for node_id in nodes_ids:
+            self._process_node(get_node(node_id))
+
     def run_single_flow(self):
         self.fill_started_nodes_deque()
         while len(self._nodes_flow_deque) > 0:
-            node_id = self._nodes_flow_deque.popleft()
-            node = self.graph.get_node(node_id)
-            output_nodes_ids = node.forward_flow(self.graph, self.current_flow_num)
-            if len(output_nodes_ids) > 0:
-                self.append_to_nodes_deque(output_nodes_ids)
-            else:
-                self.process_leaf(node_id)
+            self._push_step()
+        self.graph.flush_draw()
 
     def is_flow_completed(self) -> bool:
-        return any([self.graph.get_node(in_node_id).has_stopped is True for in_node_id in self.graph.input_nodes_ids])
+        get_node = self.graph.get_node
+        return any(get_node(in_node_id).has_stopped is True for in_node_id in self.graph.input_nodes_ids)
 
     def run_flow(self) -> None:
         while not self.is_flow_completed():
@@ -1,7 +1,6 @@
 """Implementation of the Graph which main function is to contain all nodes"""
 import logging
-from copy import copy
-from typing import List, Set
+from typing import FrozenSet, List, Sequence
 
 import gin
 
@@ -15,6 +14,7 @@ class Graph:
     def __init__(self, input_nodes: List[Receptor], draw_graph: bool = True, clear_graph: bool = False):
         self.all_nodes = {}
         self.input_nodes_ids: List[int] = []
+        self.input_nodes_ids_set: FrozenSet[int] = frozenset()
         self.draw_graph = draw_graph
         self.__proxy_graph = NetStreamProxyGraph() if self.draw_graph else None
         if clear_graph and draw_graph:
@@ -46,6 +46,7 @@ class Graph:
 
         if is_input:
             self.input_nodes_ids.append(node.id)
+            self.input_nodes_ids_set = frozenset(self.input_nodes_ids)
             self.set_node_draw_attribute(node.id)
             self.set_node_size(node.id)
 
@@ -53,6 +54,11 @@ class Graph:
         if self.draw_graph:
             self.__proxy_graph.add_node_attribute(self._get_node_draw_id(node_id), atr, atr_type)
 
+    def flush_draw(self):
+        """Send all buffered draw events"""
+        if self.draw_graph:
+            self.__proxy_graph.flush()
+
     def set_node_size(self, node_id: int):
         if self.draw_graph:
             self.__proxy_graph.change_node_attribute(self._get_node_draw_id(node_id), "ui.size", "0.3gu", "1.5gu")
@@ -61,14 +67,15 @@ class Graph:
         assert node_id in self.all_nodes, f"Node with id = {node_id} not found"
         node_to_delete = self.all_nodes[node_id]
 
-        if node_id in self.input_nodes_ids:
+        if node_id in self.input_nodes_ids_set:
             self.input_nodes_ids.remove(node_id)
+            self.input_nodes_ids_set = frozenset(self.input_nodes_ids)
 
-        input_edges_to_delete = copy(node_to_delete._input_nodes_ids)
+        input_edges_to_delete = tuple(node_to_delete._input_nodes_ids)
         for input_node_id in input_edges_to_delete:
             self.del_edge(input_node_id, node_id)
 
-        output_edges_to_delete = copy(node_to_delete._output_nodes_ids)
+        output_edges_to_delete = tuple(node_to_delete._output_nodes_ids)
         for output_node_id in output_edges_to_delete:
             self.del_edge(node_id, output_node_id)
             if recursively and len(self.get_node(output_node_id)._input_nodes_ids) == 0:
@@ -79,7 +86,7 @@ class Graph:
         if self.draw_graph:
             self.__proxy_graph.remove_node(self._get_node_draw_id(node_id))
 
-    def add_edges(self, node_id: int, nodes_ids: List[int], as_input: bool = True):
+    def add_edges(self, node_id: int, nodes_ids: Sequence[int], as_input: bool = True):
         for second_node_id in nodes_ids:
             if as_input:
                 self.add_edge(second_node_id, node_id)
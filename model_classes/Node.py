@@ -26,13 +26,15 @@ class Node:
 
     def is_ready_to_calculate(self, graph: 'Graph', current_flow_id: int) -> bool:
         """Check input nodes values"""
-        return all([graph.get_node(node_id).flow_calc_id == current_flow_id for node_id in self._input_nodes_ids])
+        get_node = graph.get_node
+        return all(get_node(node_id).flow_calc_id == current_flow_id for node_id in self._input_nodes_ids)
 
     def calc_value(self, input_values: List[Any]) -> Any:
         raise NotImplemented("calc_value is not implemented")
 
     def get_input_values(self, graph: 'Graph') -> List[Any]:
-        return [graph.get_node(node_id).value for node_id in self._input_nodes_ids]
+        get_node = graph.get_node
+        return [get_node(node_id).value for node_id in self._input_nodes_ids]
 
     def forward_flow(self, graph: 'Graph', current_flow_id: int) -> Optional[List[int]]:
         """Calculates value and returns nodes to be processed next in the flow"""
@@ -0,0 +1,32 @@
+import unittest
+from typing import Any, List
+
+from model_classes import BaseFlow, Graph, Node, Receptor
+
+
+class CountNode(Node):
+    """Node which value is the number of its calculations"""
+
+    def __init__(self):
+        super().__init__(default_value=0)
+
+    def calc_value(self, input_values: List[Any]) -> Any:
+        return self.value + 1
+
+
+class BaseFlowTest(unittest.TestCase):
+    def test_stopped_receptor_children_are_not_calculated(self):
+        short_receptor = Receptor(iter([1.0]))
+        long_receptor = Receptor(iter([1.0, 2.0, 3.0]))
+        graph = Graph([short_receptor, long_receptor], draw_graph=False)
+        short_child, long_child = CountNode(), CountNode()
+        graph.add_node(short_child)
+        graph.add_edge(short_receptor.id, short_child.id)
+        graph.add_node(long_child)
+        graph.add_edge(long_receptor.id, long_child.id)
+
+        flow = BaseFlow(graph)
+        for _ in range(2):
+            flow.run_single_flow()
+            flow.current_flow_num += 1
+        self.assertEqual([(node.value, node.flow_calc_id) for node in (short_child, long_child)], [(1, 0), (2, 1)])
@@ -0,0 +1,106 @@
+import unittest
+
+from gs_netstream.constants import *
+from gs_netstream.sender import NetStreamSender
+from gs_netstream.sender_utils import encode_unsigned
+
+EVENTS = [
+    (EVENT_ADD_NODE, "source", 1, "1"),
+    (EVENT_ADD_NODE, "source", 2, "2"),
+    (EVENT_ADD_EDGE, "source", 3, "1_2", "1", "2", True),
+    (EVENT_ADD_NODE_ATTR, "source", 4, "1", "ui.class", "still_neuron"),
+    (EVENT_CHG_NODE_ATTR, "source", 5, "1", "ui.size", "0.3gu", "1.5gu"),
+    (EVENT_STEP, "source", 6, 1.5),
+    (EVENT_ADD_GRAPH_ATTR, "other_source", 7, "ui.quality", 1),
+    (EVENT_CHG_GRAPH_ATTR, "other_source", 8, "weight", 0.5, [1.0, 2.0]),
+    (EVENT_ADD_EDGE_ATTR, "source", 9, "1_2", "ui.class", "active"),
+    (EVENT_DEL_EDGE_ATTR, "source", 10, "1_2", "ui.class"),
+    (EVENT_DEL_NODE_ATTR, "source", 11, "1", "ui.class"),
+    (EVENT_DEL_GRAPH_ATTR, "other_source", 12, "weight"),
+    (EVENT_DEL_EDGE, "source", 13, "1_2"),
+    (EVENT_DEL_NODE, "source", 14, "2"),
+    (EVENT_CLEARED, "source", 15),
+]
+
+SINK_METHODS = {
+    EVENT_ADD_NODE: NetStreamSender.node_added,
+    EVENT_DEL_NODE: NetStreamSender.node_removed,
+    EVENT_ADD_EDGE: NetStreamSender.edge_added,
+    EVENT_DEL_EDGE: NetStreamSender.edge_removed,
+    EVENT_STEP: NetStreamSender.step_begun,
+    EVENT_CLEARED: NetStreamSender.graph_cleared,
+    EVENT_ADD_GRAPH_ATTR: NetStreamSender.graph_attribute_added,
+    EVENT_CHG_GRAPH_ATTR: NetStreamSender.graph_attribute_changed,
+    EVENT_DEL_GRAPH_ATTR: NetStreamSender.graph_attribute_removed,
+    EVENT_ADD_NODE_ATTR: NetStreamSender.node_attribute_added,
+    EVENT_CHG_NODE_ATTR: NetStreamSender.node_attribute_changed,
+    EVENT_DEL_NODE_ATTR: NetStreamSender.node_attribute_removed,
+    EVENT_ADD_EDGE_ATTR: NetStreamSender.edge_attribute_added,
+    EVENT_CHG_EDGE_ATTR: NetStreamSender.edge_attribute_changed,
+    EVENT_DEL_EDGE_ATTR: NetStreamSender.edge_attribute_removed,
+}
+
+
+class RecordingTransport:
+    """Transport which keeps sent bytes in memory, flushed bytes are split into chunks"""
+
+    def __init__(self):
+        self.buff = bytearray()
+        self.flushed_chunks = []
+
+    def send(self, data):
+        self.buff.extend(data)
+
+    def flush(self):
+        if self.buff:
+            self.flushed_chunks.append(bytes(self.buff))
+            self.buff = bytearray()
+
+    def close(self):
+        self.flush()
+
+
+class SenderTest(unittest.TestCase):
+    @staticmethod
+    def _get_sender() -> NetStreamSender:
+        sender = NetStreamSender(port=0)
+        sender.transport = RecordingTransport()
+        return sender
+
+    def test_send_many_same_as_sink_methods(self):
+        sink_methods_sender = self._get_sender()
+        for event, *args in EVENTS:
+            SINK_METHODS[event](sink_methods_sender, *args)
+        sink_methods_sender.flush()
+
+        send_many_sender = self._get_sender()
+        send_many_sender.send_many(EVENTS)
+        send_many_sender.flush()
+
+        self.assertEqual(send_many_sender.transport.flushed_chunks, sink_methods_sender.transport.flushed_chunks)
+        self.assertEqual(len(send_many_sender.transport.flushed_chunks), 2)
+
+    def test_sink_methods_keyword_arguments(self):
+        sender = self._get_sender()
+        sender.edge_added("source", 1, "1_2", "1", "2", True)
+        sender.edge_added(source_id="source", time_id=1, edge_id="1_2", from_node="1", to_node="2", directed=True)
+        sender.flush()
+        data = sender.transport.flushed_chunks[0]
+        self.assertEqual(data[:len(data) // 2], data[len(data) // 2:])
+
+    def test_wrong_arguments_number(self):
+        sender = self._get_sender()
+        with self.subTest("sink method"), self.assertRaises(TypeError):
+            sender.node_added("source", 1, "1", "2")
+        with self.subTest("send_many"), self.assertRaises(TypeError):
+            sender.send_many([(EVENT_ADD_EDGE, "source", 1, "1_2", "1", "2")])
+        with self.subTest("emit"), self.assertRaises(TypeError):
+            sender.emit(EVENT_DEL_NODE, "source", 1, ())
+
+    def test_unsigned_encoding_sizes(self):
+        for value, size in ((0, 1), (127, 1), (128, 2), (2 ** 14 - 1, 2), (2 ** 14, 3), (2 ** 56 - 1, 8), (2 ** 56, 9)):
+            with self.subTest(f"{value=}"):
+                encoded = encode_unsigned(value)
+                self.assertEqual(len(encoded), size)
+                self.assertEqual(sum((byte & 127) << (7 * i) for i, byte in enumerate(encoded)), value)
+                self.assertEqual([byte >> 7 for byte in encoded], [1] * (size - 1) + [0])